@@ -235,7 +235,7 @@ def merge_tuples(base: tuple, new: tuple) -> tuple:
 
 def merge_lists(base: list, new: list) -> list:
     """Merge 2 lists."""
-    return list(x for x in base if x not in new) + list(new)
+    return [x for x in base if x not in new] + list(new)
 
 
 def create_tempfile():
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping
 from typing import TYPE_CHECKING, cast
 
 from kitchen_assistant.common.helpers.util import get_changed_keys
@@ -41,6 +41,7 @@ class PlayerController:
         self.mass = mass
         self._players: dict[str, Player] = {}
         self._prev_states: dict[str, dict] = {}
+        self._revision = 0
         self.queues = PlayerQueuesController(self)
 
     async def setup(self) -> None:
@@ -56,6 +57,20 @@ class PlayerController:
         """Return all loaded/running MusicProviders."""
         return self.mass.get_providers(ProviderType.MUSIC)  # type: ignore=return-value
 
+    @property
+    def revision(self) -> int:
+        """Return (monotonic) revision of the player roster.
+
+        Increases whenever a player is added/removed, enabled/disabled or renamed,
+        which allows (expensive) derived data to be cached until the roster changes.
+        """
+        return self._revision
+
+    @property
+    def players_by_id(self) -> Mapping[str, Player]:
+        """Return (read-only) mapping of all registered players by player_id."""
+        return self._players
+
     def __iter__(self) -> Iterator[Player]:
         """Iterate over (available) players."""
         return iter(self._players.values())
@@ -125,6 +140,7 @@ class PlayerController:
         self.mass.create_task(self.queues.on_player_register(player))
 
         self._players[player_id] = player
+        self._revision += 1
 
         # ignore disabled players
         if not player.enabled:
@@ -158,6 +174,7 @@ class PlayerController:
         if player is None:
             return
         LOGGER.info("Player removed: %s", player.name)
+        self._revision += 1
         self.queues.on_player_remove(player_id)
         self.mass.config.remove(f"players/{player_id}")
         self._prev_states.pop(player_id, None)
@@ -210,6 +227,8 @@ class PlayerController:
             ignore_keys=["elapsed_time", "elapsed_time_last_updated"],
         )
         self._prev_states[player_id] = new_state
+        if "display_name" in changed_keys or "enabled" in changed_keys:
+            self._revision += 1
 
         if not player.enabled and not force_update:
             # ignore updates for disabled players
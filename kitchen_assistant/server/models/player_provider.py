@@ -1,6 +1,7 @@
 """Model/base for a Metadata Provider implementation."""
 from __future__ import annotations
 
+import asyncio
 from abc import abstractmethod
 from typing import TYPE_CHECKING
 
@@ -21,6 +22,9 @@ class PlayerProvider(Provider):
     Player Provider implementations should inherit from this base model.
     """
 
+    # set to True if the provider wants to receive cmd_play_media_batch from group players
+    supports_play_media_batch: bool = False
+
     def get_player_config_entries(self, player_id: str) -> tuple[ConfigEntry, ...]:
         """Return all (provider/player specific) Config Entries for the given player (if any)."""
         return tuple()
@@ -74,6 +78,41 @@ class PlayerProvider(Provider):
             - flow_mode: enable flow mode where the queue tracks are streamed as continuous stream.
         """
 
+    async def cmd_play_media_batch(
+        self,
+        player_ids: list[str],
+        queue_item: QueueItem,
+        seek_position: int = 0,
+        fade_in: bool = False,
+        flow_mode: bool = False,
+    ) -> None:
+        """Send PLAY MEDIA command to multiple players of this provider at once.
+
+        This is called by group players that start the same QueueItem on several players.
+        Player providers that are able to start playback on multiple players with a single
+        (native group) command may override this and set `supports_play_media_batch`.
+        The default implementation simply sends the PLAY MEDIA command to each player.
+
+            - player_ids: player_id's of the players to handle the command.
+            - queue_item: the QueueItem to start playing on the players.
+            - seek_position: start playing from this specific position.
+            - fade_in: fade in the music at start (e.g. at resume).
+            - flow_mode: enable flow mode where the queue tracks are streamed as continuous stream.
+        """
+        # will only be called for providers with supports_play_media_batch set.
+        await asyncio.gather(
+            *[
+                self.cmd_play_media(
+                    player_id,
+                    queue_item=queue_item,
+                    seek_position=seek_position,
+                    fade_in=fade_in,
+                    flow_mode=flow_mode,
+                )
+                for player_id in player_ids
+            ]
+        )
+
     async def cmd_power(self, player_id: str, powered: bool) -> None:
         """Send POWER command to given player.
 
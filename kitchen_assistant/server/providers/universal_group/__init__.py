@@ -7,7 +7,8 @@ allowing the user to create player groups from all players known in the system.
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING
+from collections.abc import Coroutine, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
 
 from kitchen_assistant.common.models.config_entries import (
     CONF_ENTRY_FLOW_MODE,
@@ -37,6 +38,7 @@ if TYPE_CHECKING:
 
 
 CONF_GROUP_MEMBERS = "group_members"
+CONF_MAX_CONCURRENT_COMMANDS = "max_concurrent_commands"
 
 CONF_ENTRY_OUTPUT_CHANNELS_FORCED_STEREO = ConfigEntry.from_dict(
     {
@@ -49,6 +51,24 @@ CONF_ENTRY_OUTPUT_CHANNELS_FORCED_STEREO = ConfigEntry.from_dict(
 CONF_ENTRY_FORCED_FLOW_MODE = ConfigEntry.from_dict(
     {**CONF_ENTRY_FLOW_MODE.to_dict(), "hidden": True, "default_value": True, "value": True}
 )
+_PLAYER_CONFIG_ENTRIES = (
+    CONF_ENTRY_HIDE_GROUP_MEMBERS,
+    CONF_ENTRY_GROUPED_POWER_ON,
+    CONF_ENTRY_OUTPUT_CHANNELS_FORCED_STEREO,
+    CONF_ENTRY_FORCED_FLOW_MODE,
+)
+_SUPPORTED_FEATURES = (
+    PlayerFeature.POWER,
+    PlayerFeature.PAUSE,
+    PlayerFeature.VOLUME_SET,
+    PlayerFeature.VOLUME_MUTE,
+    PlayerFeature.SET_MEMBERS,
+)
+_ACTIVE_STATES = frozenset((PlayerState.PLAYING, PlayerState.PAUSED))
+
+# cached player options (per existing instance_id) for the group members config entry,
+# along with the player roster revision they were created for.
+_options_cache: dict[str, tuple[int, tuple[ConfigValueOption, ...]]] = {}
 # ruff: noqa: ARG002
 
 
@@ -75,11 +95,19 @@ async def get_config_entries(
     values: the (intermediate) raw values for config entries sent with the action.
     """
     # ruff: noqa: ARG001
-    all_players = tuple(
-        ConfigValueOption(x.display_name, x.player_id)
-        for x in mass.players.all(True, True, False)
-        if x.player_id != instance_id
-    )
+    revision = mass.players.revision
+    cached = _options_cache.get(instance_id) if instance_id else None
+    if cached is not None and cached[0] == revision:
+        all_players = cached[1]
+    else:
+        all_players = tuple(
+            ConfigValueOption(x.display_name, x.player_id)
+            for x in mass.players.all(True, True, False)
+            if x.player_id != instance_id
+        )
+        if instance_id:
+            # only cache for existing instances, a new instance setup is a one-off
+            _options_cache[instance_id] = (revision, all_players)
     return (
         ConfigEntry(
             key=CONF_GROUP_MEMBERS,
@@ -90,16 +118,33 @@ async def get_config_entries(
             description="Select all players you want to be part of this group",
             multi_value=True,
         ),
+        ConfigEntry(
+            key=CONF_MAX_CONCURRENT_COMMANDS,
+            type=ConfigEntryType.INTEGER,
+            range=(1, 100),
+            default_value=10,
+            label="Maximum concurrent commands",
+            description="The maximum number of group members a command (e.g. play or stop) "
+            "is sent to at the same time. Lower this value if the players of a large group "
+            "do not (all) respond properly to commands sent to the group.",
+            advanced=True,
+        ),
     )
 
 
 class UniversalGroupProvider(PlayerProvider):
     """Base/builtin provider for universally grouping players."""
 
-    prev_sync_leaders: tuple[str] | None = None
+    # (player_id, can_sync_with) of the sync leaders at the end of the last sync
+    _prev_sync_state: frozenset[tuple[str, tuple[str, ...]]] = frozenset()
 
     async def handle_setup(self) -> None:
         """Handle async initialization of the provider."""
+        # a change of the provider config reloads the provider,
+        # so it is safe to resolve the (configured) group members only once
+        self._conf_members: tuple[str, ...] = tuple(self.config.get_value(CONF_GROUP_MEMBERS) or ())
+        self._conf_members_set: frozenset[str] = frozenset(self._conf_members)
+        self._fanout_sem = asyncio.Semaphore(self.config.get_value(CONF_MAX_CONCURRENT_COMMANDS))
         self.player = Player(
             player_id=self.instance_id,
             provider=self.domain,
@@ -109,45 +154,36 @@ class UniversalGroupProvider(PlayerProvider):
             powered=False,
             device_info=DeviceInfo(model=self.manifest.name, manufacturer="Music Assistant"),
             # TODO: derive playerfeatures from (all) underlying child players
-            supported_features=(
-                PlayerFeature.POWER,
-                PlayerFeature.PAUSE,
-                PlayerFeature.VOLUME_SET,
-                PlayerFeature.VOLUME_MUTE,
-                PlayerFeature.SET_MEMBERS,
-            ),
+            supported_features=_SUPPORTED_FEATURES,
             active_source=self.instance_id,
-            group_childs=self.config.get_value(CONF_GROUP_MEMBERS),
+            group_childs=list(self._conf_members),
         )
         self.mass.players.register_or_update(self.player)
 
     async def unload(self) -> None:
         """Handle close/cleanup of the provider."""
+        _options_cache.pop(self.instance_id, None)
         self.mass.players.remove(self.instance_id)
 
-    def get_player_config_entries(self, player_id: str) -> tuple[ConfigEntry]:  # noqa: ARG002
+    def get_player_config_entries(self, player_id: str) -> tuple[ConfigEntry, ...]:  # noqa: ARG002
         """Return all (provider/player specific) Config Entries for the given player (if any)."""
-        return (
-            CONF_ENTRY_HIDE_GROUP_MEMBERS,
-            CONF_ENTRY_GROUPED_POWER_ON,
-            CONF_ENTRY_OUTPUT_CHANNELS_FORCED_STEREO,
-            CONF_ENTRY_FORCED_FLOW_MODE,
-        )
+        return _PLAYER_CONFIG_ENTRIES
 
     async def cmd_stop(self, player_id: str) -> None:
         """Send STOP command to given player."""
         # forward command to player and any connected sync child's
-        async with asyncio.TaskGroup() as tg:
-            for member in self._get_active_members(only_powered=True, skip_sync_childs=True):
-                if member.state == PlayerState.IDLE:
-                    continue
-                tg.create_task(self.mass.players.cmd_stop(member.player_id))
+        await self._fan_out(
+            self.mass.players.cmd_stop(member.player_id)
+            for member in self._get_active_members(only_powered=True, skip_sync_childs=True)
+            if member.state != PlayerState.IDLE
+        )
 
     async def cmd_play(self, player_id: str) -> None:
         """Send PLAY command to given player."""
-        async with asyncio.TaskGroup() as tg:
-            for member in self._get_active_members(only_powered=True, skip_sync_childs=True):
-                tg.create_task(self.mass.players.cmd_play(member.player_id))
+        await self._fan_out(
+            self.mass.players.cmd_play(member.player_id)
+            for member in self._get_active_members(only_powered=True, skip_sync_childs=True)
+        )
 
     async def cmd_play_media(
         self,
@@ -168,62 +204,94 @@ class UniversalGroupProvider(PlayerProvider):
             - seek_position: start playing from this specific position.
             - fade_in: fade in the music at start (e.g. at resume).
         """
-        # send stop first
-        await self.cmd_stop(player_id)
-        # power ON
-        await self.cmd_power(player_id, True)
-        # issue sync command (just in case)
+        # send stop and power ON (of the child players) concurrently:
+        # stop only addresses the powered members which ignore a power ON command
+        # skip them if the group is already in the required state
+        prepare: list[Coroutine[Any, Any, Any]] = []
+        if any(
+            x.state != PlayerState.IDLE
+            for x in self._iter_active_members(only_powered=True, skip_sync_childs=True)
+        ):
+            prepare.append(self.cmd_stop(player_id))
+        if not self.player.powered:
+            prepare.append(self._set_power(player_id, True))
+        await asyncio.gather(*prepare)
+        # issue sync command (just in case), only after stop and power ON are both done
         await self._sync_players()
-        # forward command to all (powered) group child's
-        async with asyncio.TaskGroup() as tg:
-            for member in self._get_active_members(only_powered=True, skip_sync_childs=True):
+        # forward command to all (powered) group child's, grouped by their provider
+        # resolve the members only now, powering on the group changes their active source
+        by_provider: dict[str, tuple[PlayerProvider, list[str]]] = {}
+        for member in self._iter_active_members(only_powered=True, skip_sync_childs=True):
+            if (prov_members := by_provider.get(member.provider)) is None:
                 player_prov = self.mass.players.get_player_provider(member.player_id)
-                tg.create_task(
-                    player_prov.cmd_play_media(
-                        member.player_id,
+                prov_members = by_provider[member.provider] = (player_prov, [])
+            prov_members[1].append(member.player_id)
+        coros: list[Coroutine[Any, Any, None]] = []
+        for player_prov, player_ids in by_provider.values():
+            if player_prov.supports_play_media_batch:
+                # provider can start all its players at once
+                coros.append(
+                    player_prov.cmd_play_media_batch(
+                        player_ids,
                         queue_item=queue_item,
                         seek_position=seek_position,
                         fade_in=fade_in,
                         flow_mode=flow_mode,
                     )
                 )
+                continue
+            # send the command to each player (within our own concurrency limit)
+            coros.extend(
+                player_prov.cmd_play_media(
+                    player_id,
+                    queue_item=queue_item,
+                    seek_position=seek_position,
+                    fade_in=fade_in,
+                    flow_mode=flow_mode,
+                )
+                for player_id in player_ids
+            )
+        await self._fan_out(coros)
 
     async def cmd_pause(self, player_id: str) -> None:
         """Send PAUSE command to given player."""
-        async with asyncio.TaskGroup() as tg:
-            for member in self._get_active_members(only_powered=True, skip_sync_childs=True):
-                tg.create_task(self.mass.players.cmd_pause(member.player_id))
+        await self._fan_out(
+            self.mass.players.cmd_pause(member.player_id)
+            for member in self._get_active_members(only_powered=True, skip_sync_childs=True)
+        )
 
     async def cmd_power(self, player_id: str, powered: bool) -> None:
         """Send POWER command to given player."""
-        if self.player.powered == powered:
-            return  # nothing to do
-        group_power_on = self.mass.config.get_player_config_value(player_id, CONF_GROUPED_POWER_ON)
-        if powered and not group_power_on:
-            return  # nothing to do
-
-        async def set_child_power(child_player: Player) -> None:
-            await self.mass.players.cmd_power(child_player.player_id, powered)
-            # set optimistic state on child player to prevent race conditions in other actions
-            child_player.powered = powered
-
-        async with asyncio.TaskGroup() as tg:
-            for member in self._get_active_members(
-                only_powered=not powered, skip_sync_childs=False
-            ):
-                tg.create_task(set_child_power(member))
-
-        self.player.powered = powered
-        self.mass.players.update(self.instance_id)
-        if powered:
+        if await self._set_power(player_id, powered) and powered:
             # sync all players on power on
             await self._sync_players()
 
     async def cmd_volume_set(self, player_id: str, volume_level: int) -> None:
         """Send VOLUME_SET command to given player."""
+        # scale the volume of the (powered) members relative to the current group volume
+        cur_volume = self.player.group_volume
+        coros: list[Coroutine[Any, Any, None]] = []
+        for member in self._get_active_members(only_powered=True, skip_sync_childs=False):
+            if cur_volume:
+                new_volume = round(member.volume_level * volume_level / cur_volume)
+            else:
+                # all members are at zero volume, nothing to scale from
+                new_volume = volume_level
+            coros.append(
+                self.mass.players.cmd_volume_set(member.player_id, max(0, min(100, new_volume)))
+            )
+        await self._fan_out(coros)
+        self.player.volume_level = volume_level
+        self.mass.players.update(self.instance_id)
 
     async def cmd_volume_mute(self, player_id: str, muted: bool) -> None:
         """Send VOLUME MUTE command to given player."""
+        await self._fan_out(
+            self.mass.players.cmd_volume_mute(member.player_id, muted)
+            for member in self._get_active_members(only_powered=True, skip_sync_childs=False)
+        )
+        self.player.volume_muted = muted
+        self.mass.players.update(self.instance_id)
 
     async def poll_player(self, player_id: str) -> None:
         """Poll player for state updates."""
@@ -232,22 +300,25 @@ class UniversalGroupProvider(PlayerProvider):
 
     def update_attributes(self) -> None:
         """Update player attributes."""
-        all_members = self._get_active_members(only_powered=False, skip_sync_childs=False)
-        self.player.group_childs = list(x.player_id for x in all_members)
-        # read the state from the first powered child player
-        for member in all_members:
-            if member.synced_to:
-                continue
-            if not member.powered:
-                continue
-            if member.state not in (PlayerState.PLAYING, PlayerState.PAUSED):
-                continue
-            self.player.current_item_id = member.current_item_id
-            self.player.current_url = member.current_url
-            self.player.elapsed_time = member.elapsed_time
-            self.player.elapsed_time_last_updated = member.elapsed_time_last_updated
-            self.player.state = member.state
-            break
+        group_childs: list[str] = []
+        leader: Player | None = None
+        for member in self._iter_active_members(only_powered=False, skip_sync_childs=False):
+            group_childs.append(member.player_id)
+            # read the state from the first powered (unsynced) child player that is active
+            if (
+                leader is None
+                and not member.synced_to
+                and member.powered
+                and member.state in _ACTIVE_STATES
+            ):
+                leader = member
+        self.player.group_childs = group_childs
+        if leader is not None:
+            self.player.current_item_id = leader.current_item_id
+            self.player.current_url = leader.current_url
+            self.player.elapsed_time = leader.elapsed_time
+            self.player.elapsed_time_last_updated = leader.elapsed_time_last_updated
+            self.player.state = leader.state
         else:
             self.player.state = PlayerState.IDLE
             self.player.current_item_id = None
@@ -256,13 +327,15 @@ class UniversalGroupProvider(PlayerProvider):
     def on_child_state(self, player_id: str, child_player: Player, changed_keys: set[str]) -> None:
         """Call when the state of a child player updates."""
         # TODO: handle a sync leader powerin off
-        powered_players = self._get_active_members(True, False)
         if "powered" in changed_keys:
             if child_player.powered and self.player.state == PlayerState.PLAYING:
                 # a child player turned ON while the group player is already playing
                 # we need to resync/resume
                 self.mass.create_task(self.mass.players.queues.resume, player_id)
-            elif not child_player.powered and len(powered_players) == 0:
+            elif (
+                not child_player.powered
+                and next(self._iter_active_members(True, False), None) is None
+            ):
                 # the last player of a group turned off
                 # turn off the group
                 self.mass.create_task(self.cmd_power, player_id, False)
@@ -273,48 +346,123 @@ class UniversalGroupProvider(PlayerProvider):
         self, only_powered: bool = False, skip_sync_childs: bool = True
     ) -> list[Player]:
         """Get (child) players attached to a grouped player."""
-        child_players: list[Player] = []
-        conf_members: list[str] = self.config.get_value(CONF_GROUP_MEMBERS)
-        ignore_ids = set()
+        return list(self._iter_active_members(only_powered, skip_sync_childs))
+
+    def _iter_active_members(
+        self, only_powered: bool = False, skip_sync_childs: bool = True
+    ) -> Iterator[Player]:
+        """Iterate (child) players attached to a grouped player.
+
+        Lazy variant of _get_active_members for consumers that may stop early.
+        """
+        # hoist (attribute) lookups out of the loops, this is called a lot
+        conf_members = self._conf_members
+        players_get = self.mass.players.players_by_id.get
+        is_active_member = self._is_active_member
+        group_type = PlayerType.GROUP
+        # handle edge case where a group is in the group and both the group
+        # and (one of its) child's are added to this universal group.
+        # resolve these nested groups first so their child's can be skipped inline.
+        ignore_ids: set[str] = set()
         for child_id in conf_members:
-            if child_player := self.mass.players.get(child_id, False):
-                if not (not only_powered or child_player.powered):
-                    continue
-                if child_player.synced_to and skip_sync_childs:
-                    continue
-                allowed_sources = [child_player.player_id, self.instance_id] + conf_members
-                if child_player.active_source not in allowed_sources:
-                    # edge case: the child player has another group already active!
-                    continue
-                if child_player.synced_to and child_player.synced_to not in conf_members:
-                    # edge case: the child player is already synced to another player
-                    continue
-                child_players.append(child_player)
-                # handle edge case where a group is in the group and both the group
-                # and (one of its) child's are added to this universal group.
-                if child_player.type == PlayerType.GROUP:
-                    ignore_ids.update(
-                        x for x in child_player.group_childs if x != child_player.player_id
-                    )
-        return [x for x in child_players if x.player_id not in ignore_ids]
+            child_player = players_get(child_id)
+            if (
+                child_player
+                and child_player.type == group_type
+                and is_active_member(child_player, only_powered, skip_sync_childs)
+            ):
+                ignore_ids.update(
+                    x for x in child_player.group_childs if x != child_player.player_id
+                )
+        for child_id in conf_members:
+            if child_id in ignore_ids:
+                continue
+            if (child_player := players_get(child_id)) and is_active_member(
+                child_player, only_powered, skip_sync_childs
+            ):
+                yield child_player
+
+    def _is_active_member(
+        self, child_player: Player, only_powered: bool, skip_sync_childs: bool
+    ) -> bool:
+        """Return if the given (child) player is an active member of this group."""
+        if only_powered and not child_player.powered:
+            return False
+        synced_to = child_player.synced_to
+        if synced_to and skip_sync_childs:
+            return False
+        conf_members_set = self._conf_members_set
+        active_source = child_player.active_source
+        # plain comparisons instead of a membership test to not build a tuple for each child
+        if (
+            active_source != child_player.player_id  # noqa: PLR1714
+            and active_source != self.instance_id
+            and active_source not in conf_members_set
+        ):
+            # edge case: the child player has another group already active!
+            return False
+        # edge case: the child player is already synced to another player
+        return not (synced_to and synced_to not in conf_members_set)
+
+    async def _set_power(self, player_id: str, powered: bool) -> bool:
+        """Set the power state of the group (child's), return if the group power changed."""
+        if self.player.powered == powered:
+            return False  # nothing to do
+        group_power_on = self.mass.config.get_player_config_value(player_id, CONF_GROUPED_POWER_ON)
+        if powered and not group_power_on:
+            return False  # nothing to do
+        await self._fan_out(
+            self._set_child_power(member, powered)
+            for member in self._get_active_members(only_powered=not powered, skip_sync_childs=False)
+        )
+        self.player.powered = powered
+        self.mass.players.update(self.instance_id)
+        return True
+
+    async def _set_child_power(self, child_player: Player, powered: bool) -> None:
+        """Send POWER command to given child player."""
+        await self.mass.players.cmd_power(child_player.player_id, powered)
+        # set optimistic state on child player to prevent race conditions in other actions
+        child_player.powered = powered
+
+    async def _fan_out(self, coros: Iterable[Coroutine[Any, Any, None]]) -> None:
+        """Run the given (child player) commands concurrently, within the concurrency limit."""
+        await asyncio.gather(*[self._run_bounded(coro) for coro in coros])
+
+    async def _run_bounded(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run the given (child player) command within the concurrency limit."""
+        async with self._fanout_sem:
+            await coro
 
     async def _sync_players(self) -> None:
         """Sync all (possible) players."""
-        sync_leaders = set()
+        members = self._get_active_members(only_powered=True)
+        # nothing to do if the sync topology did not change since the last sync:
+        # the (unsynced) members that are able to sync are the previous sync leaders
+        # and none of them can sync with other players than before.
+        if self._prev_sync_state == frozenset(
+            (x.player_id, x.can_sync_with)
+            for x in members
+            if x.synced_to is None and x.can_sync_with
+        ):
+            return
+        sync_leaders: set[str] = set()
         # TODO: sort members on sync master priority attribute ?
-        for member in self._get_active_members(only_powered=True):
+        for member in members:
             if member.synced_to is not None:
                 continue
             if not member.can_sync_with:
                 continue
-            # check if we can join this player to an already chosen sync leader
-            if existing_leader := next(
-                (x for x in member.can_sync_with if x in sync_leaders), None
-            ):
+            # check if we can join this player to an already chosen sync leader,
+            # prefer the first one in the order of the member's can_sync_with
+            if common := sync_leaders.intersection(member.can_sync_with):
+                existing_leader = next(x for x in member.can_sync_with if x in common)
                 await self.mass.players.cmd_sync(member.player_id, existing_leader)
                 # set optimistic state to prevent race condition in play media
                 member.synced_to = existing_leader
                 continue
             # pick this member as new sync leader
             sync_leaders.add(member.player_id)
-        self.prev_sync_leaders = tuple(sync_leaders)
+        self._prev_sync_state = frozenset(
+            (x.player_id, x.can_sync_with) for x in members if x.player_id in sync_leaders
+        )
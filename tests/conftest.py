@@ -0,0 +1,31 @@
+"""Shared fixtures for the tests."""
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from kitchen_assistant.common.models.enums import PlayerType
+from kitchen_assistant.common.models.player import DeviceInfo, Player
+
+
+@pytest.fixture
+def create_player() -> Callable[..., Player]:
+    """Return a factory for basic Players, any Player attribute can be overridden."""
+
+    def _create_player(player_id: str, **kwargs: Any) -> Player:
+        return Player(
+            **{
+                "player_id": player_id,
+                "provider": "test",
+                "type": PlayerType.PLAYER,
+                "name": player_id,
+                "available": True,
+                "powered": False,
+                "device_info": DeviceInfo(),
+                "active_source": player_id,
+                **kwargs,
+            }
+        )
+
+    return _create_player
@@ -0,0 +1,53 @@
+"""Tests for the player controller."""
+
+from unittest.mock import MagicMock
+
+from kitchen_assistant.server.controllers.players import PlayerController
+
+
+def _get_player_controller(config_values: dict) -> PlayerController:
+    """Return a PlayerController on top of a mocked MusicAssistant instance."""
+    mass = MagicMock()
+    mass.closing = False
+    mass.config.get.side_effect = lambda key, default=None: config_values.get(key, default)
+    controller = PlayerController(mass)
+    controller.queues = MagicMock()
+    return controller
+
+
+def test_players_revision(create_player):
+    """Test the player roster revision only changes if the roster changes."""
+    config_values = {}
+    controller = _get_player_controller(config_values)
+    assert controller.revision == 0
+    # register
+    controller.register(create_player("player1"))
+    revision = controller.revision
+    assert revision > 0
+    # regular (state) updates do not change the roster
+    controller.update("player1")
+    player = controller.get("player1")
+    player.volume_level = 50
+    controller.update("player1")
+    assert controller.revision == revision
+    # rename
+    config_values["players/player1/name"] = "Living room"
+    controller.update("player1")
+    assert controller.revision > revision
+    revision = controller.revision
+    # disable and (re)enable
+    player.enabled = False
+    controller.update("player1", force_update=True)
+    assert controller.revision > revision
+    revision = controller.revision
+    player.enabled = True
+    controller.update("player1", force_update=True)
+    assert controller.revision > revision
+    revision = controller.revision
+    # remove
+    controller.remove("player1")
+    assert controller.revision > revision
+    revision = controller.revision
+    # removing an unknown player does not change the roster
+    controller.remove("player1")
+    assert controller.revision == revision
@@ -0,0 +1,164 @@
+"""Tests for the universal group player provider."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from kitchen_assistant.common.models.player import Player
+from kitchen_assistant.server.providers.universal_group import (
+    CONF_GROUP_MEMBERS,
+    CONF_MAX_CONCURRENT_COMMANDS,
+    UniversalGroupProvider,
+    setup,
+)
+
+
+async def _get_universal_group(
+    members: list[Player], max_concurrent_commands: int = 10
+) -> UniversalGroupProvider:
+    """Return a UniversalGroupProvider for the given members on top of a mocked instance."""
+    mass = MagicMock()
+    mass.players.players_by_id = {x.player_id: x for x in members}
+    mass.players.cmd_volume_set = AsyncMock()
+    mass.players.cmd_volume_mute = AsyncMock()
+    mass.players.cmd_sync = AsyncMock()
+    config = MagicMock()
+    config.instance_id = "universal_group1"
+    config_values = {
+        CONF_GROUP_MEMBERS: [x.player_id for x in members],
+        CONF_MAX_CONCURRENT_COMMANDS: max_concurrent_commands,
+        "log_level": "GLOBAL",
+    }
+    config.get_value.side_effect = config_values.get
+    return await setup(mass, MagicMock(), config)
+
+
+async def test_universal_group_volume(create_player):
+    """Test the volume commands are forwarded to the (powered) group members."""
+    player1 = create_player("player1", powered=True)
+    player2 = create_player("player2", powered=True)
+    player3 = create_player("player3", volume_level=10)
+    prov = await _get_universal_group([player1, player2, player3])
+    cmd_volume_set = prov.mass.players.cmd_volume_set
+    # test the member volumes are scaled relative to the group volume
+    player1.volume_level, player2.volume_level = 20, 60
+    prov.player.group_volume = 40
+    await prov.cmd_volume_set(prov.instance_id, 60)
+    assert {x.args[0]: x.args[1] for x in cmd_volume_set.call_args_list} == {
+        "player1": 30,
+        "player2": 90,
+    }
+    assert prov.player.volume_level == 60
+    prov.mass.players.update.assert_called_with(prov.instance_id)
+    # test the scaled member volumes are clamped to 100
+    cmd_volume_set.reset_mock()
+    player1.volume_level, player2.volume_level = 20, 80
+    prov.player.group_volume = 50
+    await prov.cmd_volume_set(prov.instance_id, 100)
+    assert {x.args[0]: x.args[1] for x in cmd_volume_set.call_args_list} == {
+        "player1": 40,
+        "player2": 100,
+    }
+    # test the requested volume is applied as-is if the group volume is zero
+    cmd_volume_set.reset_mock()
+    player1.volume_level, player2.volume_level = 0, 0
+    prov.player.group_volume = 0
+    await prov.cmd_volume_set(prov.instance_id, 25)
+    assert {x.args[0]: x.args[1] for x in cmd_volume_set.call_args_list} == {
+        "player1": 25,
+        "player2": 25,
+    }
+    # test mute is sent to the powered members and stored on the group player
+    await prov.cmd_volume_mute(prov.instance_id, True)
+    assert {x.args for x in prov.mass.players.cmd_volume_mute.call_args_list} == {
+        ("player1", True),
+        ("player2", True),
+    }
+    assert prov.player.volume_muted is True
+    prov.mass.players.update.assert_called_with(prov.instance_id)
+
+
+async def test_universal_group_play_media(create_player):
+    """Test play media is sent per provider, batched only if the provider opts in."""
+    players = [
+        create_player("player1", provider="batch", powered=True),
+        create_player("player2", provider="single", powered=True),
+        create_player("player3", provider="batch", powered=True),
+        create_player("player4", provider="single", powered=True),
+    ]
+    prov = await _get_universal_group(players)
+    player_provs = {
+        "batch": MagicMock(supports_play_media_batch=True),
+        "single": MagicMock(supports_play_media_batch=False),
+    }
+    for player_prov in player_provs.values():
+        player_prov.cmd_play_media = AsyncMock()
+        player_prov.cmd_play_media_batch = AsyncMock()
+    prov.mass.players.get_player_provider.side_effect = lambda player_id: player_provs[
+        prov.mass.players.players_by_id[player_id].provider
+    ]
+    prov.player.powered = True
+    queue_item = MagicMock()
+    await prov.cmd_play_media(prov.instance_id, queue_item=queue_item)
+    # all members of the opted in provider are started with a single command
+    player_provs["batch"].cmd_play_media_batch.assert_awaited_once_with(
+        ["player1", "player3"],
+        queue_item=queue_item,
+        seek_position=0,
+        fade_in=False,
+        flow_mode=False,
+    )
+    player_provs["batch"].cmd_play_media.assert_not_awaited()
+    # the members of other providers are started one by one
+    player_provs["single"].cmd_play_media_batch.assert_not_awaited()
+    assert [x.args for x in player_provs["single"].cmd_play_media.await_args_list] == [
+        ("player2",),
+        ("player4",),
+    ]
+
+
+async def test_universal_group_sync(create_player):
+    """Test syncing of the group members is only (re)done if the sync topology changed."""
+    player1 = create_player("player1", powered=True, can_sync_with=("player2",))
+    player2 = create_player("player2", powered=True, can_sync_with=("player1",))
+    player3 = create_player("player3", powered=True, can_sync_with=("player4",))
+    prov = await _get_universal_group([player1, player2, player3])
+    cmd_sync = prov.mass.players.cmd_sync
+    await prov._sync_players()
+    cmd_sync.assert_awaited_once_with("player2", "player1")
+    # test a second sync with an unchanged sync topology is skipped
+    cmd_sync.reset_mock()
+    prev_sync_state = prov._prev_sync_state
+    await prov._sync_players()
+    cmd_sync.assert_not_awaited()
+    assert prov._prev_sync_state is prev_sync_state
+    # test a sync leader that is now able to sync with an earlier sync leader is joined
+    player3.can_sync_with = ("player4", "player1")
+    await prov._sync_players()
+    cmd_sync.assert_awaited_once_with("player3", "player1")
+    # test a member that got unsynced is joined again
+    cmd_sync.reset_mock()
+    player2.synced_to = None
+    await prov._sync_players()
+    cmd_sync.assert_awaited_once_with("player2", "player1")
+
+
+async def test_universal_group_max_concurrent_commands(create_player):
+    """Test commands are sent to no more members at once than the configured limit."""
+    players = [create_player(f"player{x}", powered=True) for x in range(6)]
+    prov = await _get_universal_group(players, max_concurrent_commands=2)
+    running = 0
+    max_running = 0
+    paused: list[str] = []
+
+    async def cmd_pause(player_id: str) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        paused.append(player_id)
+
+    prov.mass.players.cmd_pause = cmd_pause
+    await prov.cmd_pause(prov.instance_id)
+    assert sorted(paused) == [x.player_id for x in players]
+    assert max_running == 2